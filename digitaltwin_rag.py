@@ -6,347 +6,554 @@ Based on Binal's production implementation
 """
 
 import os
-import json
+import re
+import sys
+import pickle
+import asyncio
+import argparse
+import hashlib
+import time
+import importlib.util
+from io import StringIO
+from collections import namedtuple, OrderedDict
+import httpx
 from dotenv import load_dotenv
-from upstash_vector import Index
-from groq import Groq
+from upstash_vector import Index, AsyncIndex
+from groq import AsyncGroq, DEFAULT_TIMEOUT as GROQ_TIMEOUT
+from prompt_toolkit import PromptSession
+from prompt_toolkit.history import FileHistory
+
+try:
+    from orjson import loads as json_loads, dumps as json_dumps
+except ImportError:  # optional speedup; stdlib json also parses raw bytes
+    from json import loads as json_loads
+    json_dumps = None
 
 # Load environment variables
 load_dotenv()
 
 # Constants
 JSON_FILE = "digitaltwin.json"
+CHUNK_CACHE_FILE = "digitaltwin.chunks.pkl"
+CHUNK_CACHE_VERSION = 4  # bump when the chunk format changes
+HISTORY_FILE = ".dt_history"
+INITIALIZED_FILE = ".dt_initialized"  # holds a hash of the index URL once it has been seeded
 GROQ_API_KEY = os.getenv('GROQ_API_KEY')
 DEFAULT_MODEL = "llama-3.1-8b-instant"
+UPSERT_BATCH_SIZE = 64
+UPSERT_CONCURRENCY = 8
+QUERY_CACHE_SIZE = 256
+TAG_FILTER_OVERFETCH = 4  # fetch top_k * this many hits when filtering by tag
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None  # pip install "httpx[http2]" to enable
+HTTP_KEEPALIVE_CONNECTIONS = 32
+HTTP_KEEPALIVE_EXPIRY = 120.0  # seconds an idle pooled connection is kept open
+DEDUPE_THRESHOLD = 0.85  # Jaccard similarity over word 3-grams
+CHUNK_TARGET_TOKENS = 256
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])\s+')
+
+# Chunk types double as categories. Literals in this module are interned
+# already; the table matters for chunks reloaded from the pickle cache, whose
+# strings are fresh objects until mapped back through it.
+CATS = {c: sys.intern(c) for c in (
+    'personal', 'contact', 'salary', 'experience', 'achievement', 'skills',
+    'certification', 'education', 'project', 'goals', 'interview', 'summary'
+)}
+
+# Static text leads and the question comes last, so every request shares the
+# longest possible prefix and Groq can reuse its cached prefill for it.
+SYSTEM_PROMPT = "You are an AI digital twin. Answer questions as if you are the person, speaking in first person about your background, skills, and experience."
+PROMPT_TEMPLATE = """Based on the following information about yourself, answer the question.
+Speak in first person as if you are describing your own background.
+Provide a helpful, professional response.
+
+Your Information:
+{context}
 
-def setup_groq_client():
+Question: {question}"""
+
+def setup_groq_client(http_client=None):
     """Setup Groq client"""
     if not GROQ_API_KEY:
         print("❌ GROQ_API_KEY not found in .env file")
         return None
     
     try:
-        client = Groq(api_key=GROQ_API_KEY)
+        # Pass Groq's own timeout explicitly; otherwise the SDK adopts the shared
+        # client's (much longer) Upstash timeout
+        client = AsyncGroq(api_key=GROQ_API_KEY, http_client=http_client, timeout=GROQ_TIMEOUT)
         print("✅ Groq client initialized successfully!")
         return client
     except Exception as e:
         print(f"❌ Error initializing Groq client: {str(e)}")
         return None
 
-def create_content_chunks(profile_data):
-    """Convert structured JSON profile into content chunks for vector embedding"""
+# Time of the last Groq request, and the in-flight warm-up tasks (asyncio
+# only keeps weak references to tasks)
+_groq_last_used = 0.0
+_warmup_tasks = set()
+
+async def warm_groq_connection(client):
+    """Open the Groq connection pool so the first completion skips the handshake"""
+    global _groq_last_used
+    _groq_last_used = time.monotonic()
+    try:
+        await client.models.list()
+    except Exception:
+        pass
+
+def start_groq_warmup(client):
+    """Re-open the Groq connection in the background if the pooled one has likely expired"""
+    if time.monotonic() - _groq_last_used < HTTP_KEEPALIVE_EXPIRY:
+        return
+    task = asyncio.create_task(warm_groq_connection(client))
+    _warmup_tasks.add(task)
+    task.add_done_callback(_warmup_tasks.discard)
+
+def _fmt(pairs):
+    """Join non-empty (label, value) pairs into sentences, skipping blank fields"""
+    text = '. '.join(f"{k}: {v}" if k else str(v) for k, v in pairs if v)
+    if text and not text.endswith(('.', '!', '?')):
+        text += '.'
+    return text
+
+def _join(parts, sep=' '):
+    """Join the non-empty parts of a phrase"""
+    return sep.join(str(p) for p in parts if p)
+
+def _text(value):
+    """Flatten list fields to comma-separated text"""
+    if isinstance(value, list):
+        return ', '.join(str(v) for v in value)
+    return value
+
+def _lookup(data, path):
+    """Walk a key path into the profile, returning None if any level is missing"""
+    for key in path:
+        if not isinstance(data, dict):
+            return None
+        data = data.get(key)
+    return data
+
+def _chunk(title, chunk_type, content, tags):
+    """Build a chunk dict; ids are assigned once all sections are collected"""
+    chunk_type = CATS[chunk_type]
+    return {
+        'title': title,
+        'type': chunk_type,
+        'content': content,
+        'metadata': {'category': chunk_type, 'tags': list(tags)}
+    }
+
+def _experience_chunks(profile_data):
+    """Work experience, STAR achievements and skills used for each role"""
     chunks = []
-    chunk_id = 1
-    
-    # Personal Information
-    if 'personal' in profile_data:
-        p = profile_data['personal']
-        chunks.append({
-            'id': f'chunk_{chunk_id}',
-            'title': 'Personal Information',
-            'type': 'personal',
-            'content': f"Name: {p.get('name', '')}. Title: {p.get('title', '')}. Location: {p.get('location', '')}. {p.get('summary', '')}",
-            'metadata': {'category': 'personal', 'tags': ['name', 'title', 'location', 'summary']}
-        })
-        chunk_id += 1
+    for exp in profile_data.get('experience', []):
+        company = exp.get('company', '')
+        chunks.append(_chunk(
+            f"Work Experience - {company}",
+            'experience',
+            _fmt([
+                ('Company', company),
+                ('Role', exp.get('title')),
+                ('Duration', exp.get('duration')),
+                ('Context', exp.get('company_context')),
+                ('Team', exp.get('team_structure'))
+            ]),
+            ['work', 'job', company.lower()]
+        ))
         
-        if p.get('elevator_pitch'):
-            chunks.append({
-                'id': f'chunk_{chunk_id}',
-                'title': 'Elevator Pitch',
-                'type': 'personal',
-                'content': p['elevator_pitch'],
-                'metadata': {'category': 'personal', 'tags': ['elevator_pitch', 'introduction']}
-            })
-            chunk_id += 1
-    
-    # Contact Information
-    if 'personal' in profile_data and 'contact' in profile_data['personal']:
-        c = profile_data['personal']['contact']
-        contact_info = f"Email: {c.get('email', '')}. Phone: {c.get('phone', '')}. LinkedIn: {c.get('linkedin', '')}. GitHub: {c.get('github', '')}."
-        chunks.append({
-            'id': f'chunk_{chunk_id}',
-            'title': 'Contact Information',
-            'type': 'contact',
-            'content': contact_info,
-            'metadata': {'category': 'contact', 'tags': ['email', 'phone', 'linkedin', 'github']}
-        })
-        chunk_id += 1
+        # STAR achievements for each role
+        for i, star in enumerate(exp.get('achievements_star', []), 1):
+            chunks.append(_chunk(
+                f"Achievement at {company} #{i}",
+                'achievement',
+                f"At {company}: " + _fmt([
+                    ('Situation', star.get('situation')),
+                    ('Task', star.get('task')),
+                    ('Action', star.get('action')),
+                    ('Result', star.get('result'))
+                ]),
+                ['star', 'accomplishment', company.lower()]
+            ))
+        
+        # Technical skills used
+        skills_used = exp.get('technical_skills_used', [])
+        if skills_used:
+            chunks.append(_chunk(
+                f"Skills Used at {company}",
+                'skills',
+                f"Technical skills used at {company}: {', '.join(skills_used)}.",
+                skills_used
+            ))
+    return chunks
+
+def _programming_chunks(profile_data):
+    """Programming languages with proficiency and frameworks"""
+    tech = _lookup(profile_data, ('skills', 'technical')) or {}
+    if 'programming_languages' not in tech:
+        return []
+    langs = []
+    for lang in tech['programming_languages']:
+        if isinstance(lang, dict):
+            years = lang.get('years')
+            frameworks = _text(lang.get('frameworks'))
+            details = _join([
+                lang.get('proficiency'),
+                years and f"{years} years",
+                frameworks and f"frameworks: {frameworks}"
+            ], ', ')
+            langs.append(_join([lang.get('language'), details and f"({details})"]))
+        else:
+            langs.append(str(lang))
+    content = _fmt([('Programming languages', _join(langs, '; '))])
+    if not content:
+        return []
+    return [_chunk('Programming Languages', 'skills', content, ['programming', 'languages', 'technical'])]
+
+def _certification_chunks(profile_data):
+    """Certifications and training"""
+    certs = _lookup(profile_data, ('skills', 'certifications'))
+    if certs is None:
+        return []
+    cert_list = []
+    for cert in certs:
+        if isinstance(cert, dict):
+            provider = cert.get('provider')
+            year = cert.get('year')
+            cert_list.append(_join([cert.get('name'), provider and f"from {provider}", year and f"({year})"]))
+        else:
+            cert_list.append(str(cert))
+    content = _fmt([('Certifications and training', _join(cert_list, '; '))])
+    if not content:
+        return []
+    return [_chunk('Certifications & Training', 'certification', content, ['certification', 'training', 'education'])]
+
+def _education_chunks(profile_data):
+    """Degree, graduation and coursework"""
+    if 'education' not in profile_data:
+        return []
+    edu = profile_data['education']
+    specialisation = edu.get('specialisation')
+    university = edu.get('university')
+    edu_content = _fmt([
+        ('Education', _join([edu.get('degree'), specialisation and f"in {specialisation}", university and f"from {university}"])),
+        ('Graduated', edu.get('graduation_year')),
+        ('Location', edu.get('location')),
+        ('Relevant coursework', _text(edu.get('relevant_coursework')))
+    ])
+    if not edu_content:
+        return []
+    return [_chunk('Education', 'education', edu_content, ['university', 'degree', 'academic'])]
+
+def _project_chunks(profile_data):
+    """One chunk per portfolio project"""
+    chunks = []
+    for proj in profile_data.get('projects_portfolio', []):
+        impact = proj.get('impact')
+        if isinstance(impact, dict):
+            impact = ', '.join(f"{k}: {v}" for k, v in impact.items())
+        proj_content = _fmt([
+            ('Project', proj.get('name')),
+            ('Type', proj.get('type')),
+            ('Description', proj.get('description')),
+            ('Technologies', _text(proj.get('technologies'))),
+            ('Key features', _text(proj.get('key_features'))),
+            ('Impact', impact)
+        ])
+        chunks.append(_chunk(f"Project - {proj.get('name', '')}", 'project', proj_content, proj.get('technologies', [])))
+    return chunks
+
+def _interview_chunks(profile_data):
+    """Behavioral, technical and situational Q&A"""
+    questions = _lookup(profile_data, ('interview_prep', 'common_questions')) or {}
+    chunks = []
+    for kind in ('behavioral', 'technical', 'situational'):
+        for q in questions.get(kind, []):
+            if isinstance(q, dict):
+                chunks.append(_chunk(
+                    f"{kind.capitalize()} Q&A - {q.get('question', '')[:50]}...",
+                    'interview',
+                    _fmt([('Question', q.get('question')), ('Answer', q.get('answer'))]),
+                    [kind, 'interview', 'question']
+                ))
+    return chunks
+
+def _weakness_chunks(profile_data):
+    """Weaknesses and how they are being addressed"""
+    weaknesses = _lookup(profile_data, ('interview_prep', 'weakness_mitigation')) or []
+    return [
+        _chunk(
+            f"Weakness & Mitigation - {w.get('weakness', '')[:30]}...",
+            'interview',
+            _fmt([('Weakness', w.get('weakness')), ('Mitigation', w.get('mitigation'))]),
+            ['weakness', 'improvement', 'growth']
+        )
+        for w in weaknesses
+    ]
+
+# Profile sections in chunk order. Flat sections are (path, title, type, fields, tags)
+# templates, where fields are (label, key) pairs read from the dict at `path`;
+# sections that expand into several chunks are builder functions.
+CHUNK_SECTIONS = (
+    (('personal',), 'Personal Information', 'personal',
+     (('Name', 'name'), ('Title', 'title'), ('Location', 'location'), (None, 'summary')),
+     ('name', 'title', 'location', 'summary')),
+    (('personal',), 'Elevator Pitch', 'personal',
+     ((None, 'elevator_pitch'),),
+     ('elevator_pitch', 'introduction')),
+    (('personal', 'contact'), 'Contact Information', 'contact',
+     (('Email', 'email'), ('Phone', 'phone'), ('LinkedIn', 'linkedin'), ('GitHub', 'github')),
+     ('email', 'phone', 'linkedin', 'github')),
+    (('salary_location',), 'Salary and Location Preferences', 'salary',
+     (('Salary expectations', 'salary_expectations'), ('Location preferences', 'location_preferences'),
+      ('Remote experience', 'remote_experience'), ('Work authorization', 'work_authorization')),
+     ('salary', 'location', 'remote', 'authorization')),
+    _experience_chunks,
+    _programming_chunks,
+    (('skills', 'technical'), 'Frontend Skills', 'skills',
+     (('Frontend technologies', 'frontend'),),
+     ('frontend', 'ui', 'web')),
+    (('skills', 'technical'), 'Backend Skills', 'skills',
+     (('Backend technologies', 'backend'),),
+     ('backend', 'server', 'api')),
+    (('skills', 'technical'), 'Database Skills', 'skills',
+     (('Database technologies', 'databases'),),
+     ('database', 'sql', 'data')),
+    (('skills', 'technical'), 'Cloud & DevOps Skills', 'skills',
+     (('Cloud and DevOps', 'cloud_platforms'),),
+     ('cloud', 'devops', 'aws', 'deployment')),
+    (('skills', 'technical'), 'AI & Machine Learning Skills', 'skills',
+     (('AI and ML experience', 'ai_ml'),),
+     ('ai', 'ml', 'machine learning', 'automation')),
+    (('skills',), 'Soft Skills', 'skills',
+     (('Soft skills', 'soft_skills'),),
+     ('soft skills', 'interpersonal', 'communication')),
+    _certification_chunks,
+    _education_chunks,
+    _project_chunks,
+    (('career_goals',), 'Career Goals', 'goals',
+     (('Career goals - Short term', 'short_term'), ('Long term', 'long_term'),
+      ('Learning focus', 'learning_focus'), ('Industries interested', 'industries_interested')),
+     ('career', 'goals', 'aspirations', 'future')),
+    _interview_chunks,
+    _weakness_chunks,
+    (('interview_signal_summary',), 'Professional Summary & Strengths', 'summary',
+     (('Strengths', 'strengths'), ('Recommended for roles', 'recommended_for'),
+      ('Unique value proposition', 'unique_value_proposition')),
+     ('strengths', 'value', 'recommendation')),
+)
+
+# Closed tag vocabulary for the vector metadata bitmask. Append only: a tag's
+# position is its bit in every stored tagmask. The mask needs up to 60 bits, so
+# it is stored as a decimal string (JS numbers are only exact to 2^53; read it
+# with BigInt on the TypeScript side).
+ALL_TAGS = (
+    'name', 'title', 'location', 'summary', 'elevator_pitch', 'introduction',
+    'email', 'phone', 'linkedin', 'github', 'salary', 'remote', 'authorization',
+    'work', 'job', 'star', 'accomplishment', 'programming', 'languages', 'technical',
+    'frontend', 'ui', 'web', 'backend', 'server', 'api', 'database', 'sql', 'data',
+    'cloud', 'devops', 'aws', 'deployment', 'ai', 'ml', 'machine learning', 'automation',
+    'soft skills', 'interpersonal', 'communication', 'certification', 'training', 'education',
+    'university', 'degree', 'academic', 'career', 'goals', 'aspirations', 'future',
+    'behavioral', 'interview', 'question', 'situational', 'weakness', 'improvement', 'growth',
+    'strengths', 'value', 'recommendation',
+)
+TAG_IDX = {tag: i for i, tag in enumerate(ALL_TAGS)}
+
+def tag_mask(tags):
+    """Pack known tags into a 64-bit mask; free-form tags (companies, technologies) are skipped"""
+    return sum(1 << TAG_IDX[tag] for tag in set(tags) if tag in TAG_IDX)
+
+def _template_chunks(profile_data, template):
+    """Render a flat section template, skipping it if the section has no content"""
+    path, title, chunk_type, fields, tags = template
+    section = _lookup(profile_data, path)
+    if not isinstance(section, dict):
+        return []
+    content = _fmt((label, _text(section.get(key))) for label, key in fields)
+    if not content:
+        return []
+    return [_chunk(title, chunk_type, content, tags)]
+
+def _approx_tokens(text):
+    """Rough token count (~4 characters per token for English text)"""
+    return len(text) // 4 + 1
+
+def _split_to_target(text, target_tokens=CHUNK_TARGET_TOKENS):
+    """Greedily pack whole sentences into pieces of about target_tokens, with no overlap"""
+    if _approx_tokens(text) <= target_tokens:
+        return [text]
     
-    # Salary and Location Preferences
-    if 'salary_location' in profile_data:
-        sl = profile_data['salary_location']
-        salary_info = f"Salary expectations: {sl.get('salary_expectations', '')}. Location preferences: {', '.join(sl.get('location_preferences', []))}. Remote experience: {sl.get('remote_experience', '')}. Work authorization: {sl.get('work_authorization', '')}."
-        chunks.append({
-            'id': f'chunk_{chunk_id}',
-            'title': 'Salary and Location Preferences',
-            'type': 'salary',
-            'content': salary_info,
-            'metadata': {'category': 'salary', 'tags': ['salary', 'location', 'remote', 'authorization']}
-        })
-        chunk_id += 1
+    pieces = []
+    current = []
+    size = 0
+    for sentence in SENTENCE_BOUNDARY.split(text):
+        tokens = _approx_tokens(sentence)
+        if current and size + tokens > target_tokens:
+            pieces.append(' '.join(current))
+            current = []
+            size = 0
+        current.append(sentence)
+        size += tokens
+    if current:
+        pieces.append(' '.join(current))
+    return pieces
+
+def _shingles(text, n=3):
+    """Word n-grams used to compare chunk contents"""
+    words = text.casefold().split()
+    return {tuple(words[i:i + n]) for i in range(max(len(words) - n + 1, 1))}
+
+def dedupe_chunks(chunks, threshold=DEDUPE_THRESHOLD):
+    """Drop chunks whose content is a near-duplicate of an earlier chunk"""
+    kept = []
+    kept_shingles = []
+    for chunk in chunks:
+        shingles = _shingles(chunk['content'])
+        if any(len(shingles & other) / len(shingles | other) >= threshold for other in kept_shingles):
+            continue
+        kept.append(chunk)
+        kept_shingles.append(shingles)
+    return kept
+
+def create_content_chunks(profile_data):
+    """Convert structured JSON profile into content chunks for vector embedding"""
+    chunks = []
+    for section in CHUNK_SECTIONS:
+        if callable(section):
+            chunks.extend(section(profile_data))
+        else:
+            chunks.extend(_template_chunks(profile_data, section))
     
-    # Work Experience
-    if 'experience' in profile_data:
-        for exp in profile_data['experience']:
-            exp_content = f"Company: {exp.get('company', '')}. Role: {exp.get('title', '')}. Duration: {exp.get('duration', '')}. Context: {exp.get('company_context', '')}. Team: {exp.get('team_structure', '')}."
-            chunks.append({
-                'id': f'chunk_{chunk_id}',
-                'title': f"Work Experience - {exp.get('company', '')}",
-                'type': 'experience',
-                'content': exp_content,
-                'metadata': {'category': 'experience', 'tags': ['work', 'job', exp.get('company', '').lower()]}
-            })
-            chunk_id += 1
-            
-            # STAR achievements for each role
-            for i, star in enumerate(exp.get('achievements_star', [])):
-                star_content = f"At {exp.get('company', '')}: Situation: {star.get('situation', '')}. Task: {star.get('task', '')}. Action: {star.get('action', '')}. Result: {star.get('result', '')}."
-                chunks.append({
-                    'id': f'chunk_{chunk_id}',
-                    'title': f"Achievement at {exp.get('company', '')} #{i+1}",
-                    'type': 'achievement',
-                    'content': star_content,
-                    'metadata': {'category': 'achievement', 'tags': ['star', 'accomplishment', exp.get('company', '').lower()]}
-                })
-                chunk_id += 1
-            
-            # Technical skills used
-            skills_used = exp.get('technical_skills_used', [])
-            if skills_used:
-                chunks.append({
-                    'id': f'chunk_{chunk_id}',
-                    'title': f"Skills Used at {exp.get('company', '')}",
-                    'type': 'skills',
-                    'content': f"Technical skills used at {exp.get('company', '')}: {', '.join(skills_used)}.",
-                    'metadata': {'category': 'skills', 'tags': skills_used}
-                })
-                chunk_id += 1
+    # Oversized sections are split on sentence boundaries; each piece keeps its parent's title
+    chunks = [
+        {**chunk, 'content': piece}
+        for chunk in chunks
+        for piece in _split_to_target(chunk['content'])
+    ]
+    chunks = dedupe_chunks(chunks)
+    chunks = [{'id': f'chunk_{chunk_id}', **chunk} for chunk_id, chunk in enumerate(chunks, 1)]
     
-    # Technical Skills
-    if 'skills' in profile_data and 'technical' in profile_data['skills']:
-        tech = profile_data['skills']['technical']
-        
-        # Programming languages
-        if 'programming_languages' in tech:
-            langs = []
-            for lang in tech['programming_languages']:
-                if isinstance(lang, dict):
-                    langs.append(f"{lang.get('language', '')} ({lang.get('proficiency', '')}, {lang.get('years', '')} years, frameworks: {', '.join(lang.get('frameworks', []))})")
-                else:
-                    langs.append(str(lang))
-            chunks.append({
-                'id': f'chunk_{chunk_id}',
-                'title': 'Programming Languages',
-                'type': 'skills',
-                'content': f"Programming languages: {'; '.join(langs)}.",
-                'metadata': {'category': 'skills', 'tags': ['programming', 'languages', 'technical']}
-            })
-            chunk_id += 1
-        
-        # Frontend skills
-        if 'frontend' in tech:
-            chunks.append({
-                'id': f'chunk_{chunk_id}',
-                'title': 'Frontend Skills',
-                'type': 'skills',
-                'content': f"Frontend technologies: {', '.join(tech['frontend'])}.",
-                'metadata': {'category': 'skills', 'tags': ['frontend', 'ui', 'web']}
-            })
-            chunk_id += 1
-        
-        # Backend skills
-        if 'backend' in tech:
-            chunks.append({
-                'id': f'chunk_{chunk_id}',
-                'title': 'Backend Skills',
-                'type': 'skills',
-                'content': f"Backend technologies: {', '.join(tech['backend'])}.",
-                'metadata': {'category': 'skills', 'tags': ['backend', 'server', 'api']}
-            })
-            chunk_id += 1
-        
-        # Database skills
-        if 'databases' in tech:
-            chunks.append({
-                'id': f'chunk_{chunk_id}',
-                'title': 'Database Skills',
-                'type': 'skills',
-                'content': f"Database technologies: {', '.join(tech['databases'])}.",
-                'metadata': {'category': 'skills', 'tags': ['database', 'sql', 'data']}
-            })
-            chunk_id += 1
-        
-        # Cloud skills
-        if 'cloud_platforms' in tech:
-            chunks.append({
-                'id': f'chunk_{chunk_id}',
-                'title': 'Cloud & DevOps Skills',
-                'type': 'skills',
-                'content': f"Cloud and DevOps: {', '.join(tech['cloud_platforms'])}.",
-                'metadata': {'category': 'skills', 'tags': ['cloud', 'devops', 'aws', 'deployment']}
-            })
-            chunk_id += 1
-        
-        # AI/ML skills
-        if 'ai_ml' in tech:
-            chunks.append({
-                'id': f'chunk_{chunk_id}',
-                'title': 'AI & Machine Learning Skills',
-                'type': 'skills',
-                'content': f"AI and ML experience: {', '.join(tech['ai_ml'])}.",
-                'metadata': {'category': 'skills', 'tags': ['ai', 'ml', 'machine learning', 'automation']}
-            })
-            chunk_id += 1
+    print(f"📦 Created {len(chunks)} content chunks from profile data")
+    return chunks
+
+def load_content_chunks():
+    """Load content chunks, reusing the pickled copy while the profile JSON is unchanged"""
+    stat = os.stat(JSON_FILE)
+    cache_key = (CHUNK_CACHE_VERSION, stat.st_mtime_ns, stat.st_size)
     
-    # Soft Skills
-    if 'skills' in profile_data and 'soft_skills' in profile_data['skills']:
-        chunks.append({
-            'id': f'chunk_{chunk_id}',
-            'title': 'Soft Skills',
-            'type': 'skills',
-            'content': f"Soft skills: {', '.join(profile_data['skills']['soft_skills'])}.",
-            'metadata': {'category': 'skills', 'tags': ['soft skills', 'interpersonal', 'communication']}
-        })
-        chunk_id += 1
+    try:
+        with open(CHUNK_CACHE_FILE, "rb") as f:
+            cached_key, chunks = pickle.load(f)
+        if cached_key == cache_key:
+            for chunk in chunks:
+                chunk['type'] = CATS.get(chunk['type'], chunk['type'])
+                metadata = chunk['metadata']
+                metadata['category'] = CATS.get(metadata['category'], metadata['category'])
+            print(f"📦 Loaded {len(chunks)} cached content chunks")
+            return chunks
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+        pass
     
-    # Certifications
-    if 'skills' in profile_data and 'certifications' in profile_data['skills']:
-        certs = profile_data['skills']['certifications']
-        cert_list = []
-        for cert in certs:
-            if isinstance(cert, dict):
-                cert_list.append(f"{cert.get('name', '')} from {cert.get('provider', '')} ({cert.get('year', '')})")
-            else:
-                cert_list.append(str(cert))
-        chunks.append({
-            'id': f'chunk_{chunk_id}',
-            'title': 'Certifications & Training',
-            'type': 'certification',
-            'content': f"Certifications and training: {'; '.join(cert_list)}.",
-            'metadata': {'category': 'certification', 'tags': ['certification', 'training', 'education']}
-        })
-        chunk_id += 1
+    with open(JSON_FILE, "rb") as f:
+        profile_data = json_loads(f.read())
     
-    # Education
-    if 'education' in profile_data:
-        edu = profile_data['education']
-        edu_content = f"Education: {edu.get('degree', '')} in {edu.get('specialisation', '')} from {edu.get('university', '')}. Graduated: {edu.get('graduation_year', '')}. Location: {edu.get('location', '')}."
-        if edu.get('relevant_coursework'):
-            edu_content += f" Relevant coursework: {', '.join(edu.get('relevant_coursework', []))}."
-        chunks.append({
-            'id': f'chunk_{chunk_id}',
-            'title': 'Education',
-            'type': 'education',
-            'content': edu_content,
-            'metadata': {'category': 'education', 'tags': ['university', 'degree', 'academic']}
-        })
-        chunk_id += 1
+    # Convert profile data to content chunks
+    chunks = create_content_chunks(profile_data)
     
-    # Projects
-    if 'projects_portfolio' in profile_data:
-        for proj in profile_data['projects_portfolio']:
-            proj_content = f"Project: {proj.get('name', '')}. Type: {proj.get('type', '')}. Description: {proj.get('description', '')}. Technologies: {', '.join(proj.get('technologies', []))}."
-            if proj.get('key_features'):
-                proj_content += f" Key features: {', '.join(proj.get('key_features', []))}."
-            if proj.get('impact'):
-                impact = proj['impact']
-                if isinstance(impact, dict):
-                    impact_str = ', '.join([f"{k}: {v}" for k, v in impact.items()])
-                    proj_content += f" Impact: {impact_str}."
-                else:
-                    proj_content += f" Impact: {impact}."
-            chunks.append({
-                'id': f'chunk_{chunk_id}',
-                'title': f"Project - {proj.get('name', '')}",
-                'type': 'project',
-                'content': proj_content,
-                'metadata': {'category': 'project', 'tags': proj.get('technologies', [])}
-            })
-            chunk_id += 1
+    try:
+        with open(CHUNK_CACHE_FILE, "wb") as f:
+            pickle.dump((cache_key, chunks), f, protocol=pickle.HIGHEST_PROTOCOL)
+    except OSError as e:
+        print(f"⚠️ Could not write chunk cache: {str(e)}")
     
-    # Career Goals
-    if 'career_goals' in profile_data:
-        goals = profile_data['career_goals']
-        goals_content = f"Career goals - Short term: {goals.get('short_term', '')}. Long term: {goals.get('long_term', '')}. Learning focus: {', '.join(goals.get('learning_focus', []))}. Industries interested: {', '.join(goals.get('industries_interested', []))}."
-        chunks.append({
-            'id': f'chunk_{chunk_id}',
-            'title': 'Career Goals',
-            'type': 'goals',
-            'content': goals_content,
-            'metadata': {'category': 'goals', 'tags': ['career', 'goals', 'aspirations', 'future']}
-        })
-        chunk_id += 1
+    return chunks
+
+class OrjsonAsyncClient(httpx.AsyncClient):
+    """httpx client that encodes JSON request bodies with orjson when it is installed"""
     
-    # Interview Prep - Behavioral Questions
-    if 'interview_prep' in profile_data and 'common_questions' in profile_data['interview_prep']:
-        questions = profile_data['interview_prep']['common_questions']
-        
-        if 'behavioral' in questions:
-            for q in questions['behavioral']:
-                if isinstance(q, dict):
-                    chunks.append({
-                        'id': f'chunk_{chunk_id}',
-                        'title': f"Behavioral Q&A - {q.get('question', '')[:50]}...",
-                        'type': 'interview',
-                        'content': f"Question: {q.get('question', '')}. Answer: {q.get('answer', '')}",
-                        'metadata': {'category': 'interview', 'tags': ['behavioral', 'interview', 'question']}
-                    })
-                    chunk_id += 1
-        
-        if 'technical' in questions:
-            for q in questions['technical']:
-                if isinstance(q, dict):
-                    chunks.append({
-                        'id': f'chunk_{chunk_id}',
-                        'title': f"Technical Q&A - {q.get('question', '')[:50]}...",
-                        'type': 'interview',
-                        'content': f"Question: {q.get('question', '')}. Answer: {q.get('answer', '')}",
-                        'metadata': {'category': 'interview', 'tags': ['technical', 'interview', 'question']}
-                    })
-                    chunk_id += 1
-        
-        if 'situational' in questions:
-            for q in questions['situational']:
-                if isinstance(q, dict):
-                    chunks.append({
-                        'id': f'chunk_{chunk_id}',
-                        'title': f"Situational Q&A - {q.get('question', '')[:50]}...",
-                        'type': 'interview',
-                        'content': f"Question: {q.get('question', '')}. Answer: {q.get('answer', '')}",
-                        'metadata': {'category': 'interview', 'tags': ['situational', 'interview', 'question']}
-                    })
-                    chunk_id += 1
+    async def post(self, url, *, json=None, headers=None, **kwargs):
+        if json is not None and json_dumps:
+            headers = {**(headers or {}), "Content-Type": "application/json"}
+            kwargs["content"] = json_dumps(json)
+        else:
+            kwargs["json"] = json
+        return await super().post(url, headers=headers, **kwargs)
+
+def create_http_client():
+    """Keep-alive HTTP client shared by Groq and Upstash upserts.
     
-    # Weakness Mitigation
-    if 'interview_prep' in profile_data and 'weakness_mitigation' in profile_data['interview_prep']:
-        for w in profile_data['interview_prep']['weakness_mitigation']:
-            chunks.append({
-                'id': f'chunk_{chunk_id}',
-                'title': f"Weakness & Mitigation - {w.get('weakness', '')[:30]}...",
-                'type': 'interview',
-                'content': f"Weakness: {w.get('weakness', '')}. Mitigation: {w.get('mitigation', '')}",
-                'metadata': {'category': 'interview', 'tags': ['weakness', 'improvement', 'growth']}
-            })
-            chunk_id += 1
+    Uses HTTP/2 only when the optional h2 package is installed; otherwise
+    HTTP/1.1 with pooled keep-alive connections.
+    """
+    return OrjsonAsyncClient(
+        http2=HTTP2_AVAILABLE,
+        limits=httpx.Limits(
+            max_keepalive_connections=HTTP_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY
+        ),
+        timeout=httpx.Timeout(timeout=600.0, connect=10.0)
+    )
+
+async def upsert_vectors(vectors, http_client=None):
+    """Upload vectors in concurrent batches so embedding round trips overlap"""
+    aindex = AsyncIndex.from_env()
+    # The SDK builds its own httpx client and takes no client argument; close
+    # it and route its posts through ours for pooled connections and orjson
+    # serialization. A client passed in by the caller is left open for them.
+    await aindex._client.aclose()
+    client = http_client or create_http_client()
+    aindex._client = client
+    semaphore = asyncio.Semaphore(UPSERT_CONCURRENCY)
     
-    # Interview Signal Summary
-    if 'interview_signal_summary' in profile_data:
-        summary = profile_data['interview_signal_summary']
-        summary_content = f"Strengths: {', '.join(summary.get('strengths', []))}. Recommended for roles: {', '.join(summary.get('recommended_for', []))}. Unique value proposition: {summary.get('unique_value_proposition', '')}."
-        chunks.append({
-            'id': f'chunk_{chunk_id}',
-            'title': 'Professional Summary & Strengths',
-            'type': 'summary',
-            'content': summary_content,
-            'metadata': {'category': 'summary', 'tags': ['strengths', 'value', 'recommendation']}
-        })
-        chunk_id += 1
+    async def upsert_batch(batch):
+        async with semaphore:
+            await aindex.upsert(vectors=batch)
     
-    print(f"📦 Created {len(chunks)} content chunks from profile data")
-    return chunks
+    batches = [vectors[i:i + UPSERT_BATCH_SIZE] for i in range(0, len(vectors), UPSERT_BATCH_SIZE)]
+    try:
+        results = await asyncio.gather(*[upsert_batch(batch) for batch in batches], return_exceptions=True)
+        failed = [(i, result) for i, result in enumerate(results, 1) if isinstance(result, Exception)]
+        if failed:
+            for i, error in failed:
+                print(f"❌ Upsert batch {i}/{len(batches)} failed: {str(error)}")
+            # Roll back the batches that did land so the next start finds an
+            # empty index and seeds again, instead of treating it as done
+            await aindex.reset()
+            raise RuntimeError(f"{len(failed)} of {len(batches)} upsert batches failed")
+    finally:
+        if client is not http_client:
+            await client.aclose()
+
+def _index_fingerprint():
+    """Identify the configured vector index without storing its URL in plain text"""
+    url = os.getenv('UPSTASH_VECTOR_REST_URL', '')
+    return hashlib.sha256(url.encode('utf-8')).hexdigest()
 
-def setup_vector_database():
+def is_initialized():
+    """Check whether the configured vector index was seeded on a previous run"""
+    try:
+        with open(INITIALIZED_FILE, "r", encoding="utf-8") as f:
+            return f.read().strip() == _index_fingerprint()
+    except OSError:
+        return False
+
+def mark_initialized():
+    """Record locally that the configured vector index is seeded"""
+    try:
+        with open(INITIALIZED_FILE, "w", encoding="utf-8") as f:
+            f.write(_index_fingerprint())
+    except OSError as e:
+        print(f"⚠️ Could not write {INITIALIZED_FILE}: {str(e)}")
+
+def clear_initialized():
+    """Forget that the vector index is seeded, so a failed seed is retried"""
+    try:
+        os.remove(INITIALIZED_FILE)
+    except FileNotFoundError:
+        pass
+
+async def setup_vector_database(reseed=False, http_client=None):
     """Setup Upstash Vector database with built-in embeddings"""
     print("🔄 Setting up Upstash Vector database...")
     
@@ -354,28 +561,36 @@ def setup_vector_database():
         index = Index.from_env()
         print("✅ Connected to Upstash Vector successfully!")
         
-        # Check current vector count
-        try:
-            info = index.info()
-            current_count = getattr(info, 'vector_count', 0)
-            print(f"📊 Current vectors in database: {current_count}")
-        except:
+        if reseed:
+            print("♻️ Reseeding: clearing existing vectors...")
+            clear_initialized()
+            await asyncio.to_thread(index.reset)
             current_count = 0
+        elif is_initialized():
+            # Seeded on a previous run; skip the info() round trip
+            print("📊 Vector database already seeded")
+            return index
+        else:
+            # Check current vector count
+            try:
+                info = await asyncio.to_thread(index.info)
+                current_count = getattr(info, 'vector_count', 0)
+                print(f"📊 Current vectors in database: {current_count}")
+            except:
+                current_count = 0
         
         # Load data if database is empty
         if current_count == 0:
             print("📝 Loading your professional profile...")
+            # Only a completed upload below re-marks the index as seeded
+            clear_initialized()
             
             try:
-                with open(JSON_FILE, "r", encoding="utf-8") as f:
-                    profile_data = json.load(f)
+                content_chunks = load_content_chunks()
             except FileNotFoundError:
                 print(f"❌ {JSON_FILE} not found!")
                 return None
             
-            # Convert profile data to content chunks
-            content_chunks = create_content_chunks(profile_data)
-            
             if not content_chunks:
                 print("❌ No content chunks created from profile data")
                 return None
@@ -393,42 +608,87 @@ def setup_vector_database():
                         "type": chunk['type'],
                         "content": chunk['content'],
                         "category": chunk.get('metadata', {}).get('category', ''),
-                        "tags": chunk.get('metadata', {}).get('tags', [])
+                        "tagmask": str(tag_mask(chunk.get('metadata', {}).get('tags', [])))
                     }
                 ))
             
             # Upload vectors
-            index.upsert(vectors=vectors)
+            await upsert_vectors(vectors, http_client)
             print(f"✅ Successfully uploaded {len(vectors)} content chunks!")
         
+        mark_initialized()
         return index
         
     except Exception as e:
         print(f"❌ Error setting up database: {str(e)}")
         return None
 
-def query_vectors(index, query_text, top_k=3):
-    """Query Upstash Vector for similar vectors"""
+Hit = namedtuple('Hit', 'title content score tagmask')
+
+# LRU of recent query results, keyed on (index, normalized question, top_k)
+_query_cache = OrderedDict()
+
+def _run_query(index, query_text, top_k):
+    """Run a vector query and freeze the results as Hit tuples"""
+    results = index.query(
+        data=query_text,
+        top_k=top_k,
+        include_metadata=True
+    )
+    hits = []
+    for result in results:
+        metadata = result.metadata or {}
+        hits.append(Hit(
+            metadata.get('title', 'Information'),
+            metadata.get('content', ''),
+            result.score,
+            int(metadata.get('tagmask') or 0)
+        ))
+    return tuple(hits)
+
+def query_vectors(index, query_text, top_k=3, tags=()):
+    """Query Upstash Vector for similar vectors, reusing results for repeated questions.
+    
+    If tags are given, only hits carrying at least one of them are kept; tags
+    outside ALL_TAGS are never stored, so they can match nothing.
+    """
+    if tags:
+        required_mask = tag_mask(tags)
+        if not required_mask:
+            return ()
+        hits = query_vectors(index, query_text, top_k * TAG_FILTER_OVERFETCH)
+        if hits is None:
+            return None
+        return tuple(hit for hit in hits if hit.tagmask & required_mask)[:top_k]
+    
+    query_text = query_text.strip()
+    # Case and surrounding whitespace only affect the cache key; Upstash embeds the text as typed
+    key = (index, query_text.casefold(), top_k)
     try:
-        results = index.query(
-            data=query_text,
-            top_k=top_k,
-            include_metadata=True
-        )
-        return results
+        hits = _query_cache.get(key)
+        if hits is None:
+            hits = _run_query(index, query_text, top_k)
+            _query_cache[key] = hits
+            if len(_query_cache) > QUERY_CACHE_SIZE:
+                _query_cache.popitem(last=False)
+        else:
+            _query_cache.move_to_end(key)
+        return hits
     except Exception as e:
         print(f"❌ Error querying vectors: {str(e)}")
         return None
 
-def generate_response_with_groq(client, prompt, model=DEFAULT_MODEL):
-    """Generate response using Groq"""
+async def generate_response_with_groq(client, prompt, model=DEFAULT_MODEL):
+    """Stream a response from Groq, yielding text as tokens arrive"""
+    global _groq_last_used
+    _groq_last_used = time.monotonic()
     try:
-        completion = client.chat.completions.create(
+        stream = await client.chat.completions.create(
             model=model,
             messages=[
                 {
                     "role": "system",
-                    "content": "You are an AI digital twin. Answer questions as if you are the person, speaking in first person about your background, skills, and experience."
+                    "content": SYSTEM_PROMPT
                 },
                 {
                     "role": "user",
@@ -436,62 +696,77 @@ def generate_response_with_groq(client, prompt, model=DEFAULT_MODEL):
                 }
             ],
             temperature=0.7,
-            max_tokens=500
+            max_tokens=500,
+            stream=True
         )
         
-        return completion.choices[0].message.content.strip()
+        started = False
+        async for chunk in stream:
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if not started and delta:
+                delta = delta.lstrip()
+                started = bool(delta)
+            if delta:
+                yield delta
         
     except Exception as e:
-        return f"❌ Error generating response: {str(e)}"
+        yield f"❌ Error generating response: {str(e)}"
+
+async def _reply(text):
+    """Wrap a fixed message as a one-item async stream"""
+    yield text
 
-def rag_query(index, groq_client, question):
-    """Perform RAG query using Upstash Vector + Groq"""
+async def rag_query(index, groq_client, question):
+    """Perform RAG query using Upstash Vector + Groq, returning an iterator over the streamed answer"""
     try:
-        # Step 1: Query vector database
-        results = query_vectors(index, question, top_k=3)
+        # Step 1: Query vector database in a worker thread. If the Groq
+        # connection has gone idle, it is re-opened in the background meanwhile;
+        # nothing waits on that, so cached lookups return immediately
+        start_groq_warmup(groq_client)
+        results = await asyncio.to_thread(query_vectors, index, question, 3)
         
         if not results or len(results) == 0:
-            return "I don't have specific information about that topic."
+            return _reply("I don't have specific information about that topic.")
         
         # Step 2: Extract relevant content
         print("\n🧠 Searching your professional profile...\n")
         
-        top_docs = []
-        for result in results:
-            metadata = result.metadata or {}
-            title = metadata.get('title', 'Information')
-            content = metadata.get('content', '')
-            score = result.score
-            
-            print(f"🔹 Found: {title} (Relevance: {score:.3f})")
-            if content:
-                top_docs.append(f"{title}: {content}")
+        # Report each hit and build the prompt context in the same pass
+        context = StringIO()
+        for hit in results:
+            print(f"🔹 Found: {hit.title} (Relevance: {hit.score:.3f})")
+            if hit.content:
+                if context.tell():
+                    context.write("\n\n")
+                context.write(f"{hit.title}: {hit.content}")
         
-        if not top_docs:
-            return "I found some information but couldn't extract details."
+        if not context.tell():
+            return _reply("I found some information but couldn't extract details.")
         
         print(f"⚡ Generating personalized response...\n")
         
         # Step 3: Generate response with context
-        context = "\n\n".join(top_docs)
-        prompt = f"""Based on the following information about yourself, answer the question.
-Speak in first person as if you are describing your own background.
-
-Your Information:
-{context}
-
-Question: {question}
-
-Provide a helpful, professional response:"""
+        prompt = PROMPT_TEMPLATE.format(context=context.getvalue(), question=question)
         
-        response = generate_response_with_groq(groq_client, prompt)
-        return response
+        return generate_response_with_groq(groq_client, prompt)
     
     except Exception as e:
-        return f"❌ Error during query: {str(e)}"
+        return _reply(f"❌ Error during query: {str(e)}")
+
+def parse_args():
+    """Parse command-line options"""
+    parser = argparse.ArgumentParser(description="Chat with your AI Digital Twin")
+    parser.add_argument(
+        "--reseed",
+        action="store_true",
+        help=f"clear the vector database and upload the profile again, ignoring {INITIALIZED_FILE}"
+    )
+    return parser.parse_args()
 
-def main():
+async def main():
     """Main application loop"""
+    args = parse_args()
+    
     print("🤖 Your Digital Twin - AI Profile Assistant")
     print("=" * 50)
     print("🔗 Vector Storage: Upstash (built-in embeddings)")
@@ -499,36 +774,41 @@ def main():
     print("📋 Data Source: Your Professional Profile\n")
     
     # Setup clients
-    groq_client = setup_groq_client()
-    if not groq_client:
-        return
-    
-    index = setup_vector_database()
-    if not index:
-        return
-    
-    print("✅ Your Digital Twin is ready!\n")
-    
-    # Interactive chat loop
-    print("🤖 Chat with your AI Digital Twin!")
-    print("Ask questions about your experience, skills, projects, or career goals.")
-    print("Type 'exit' to quit.\n")
-    
-    print("💭 Try asking:")
-    print("  - 'Tell me about your work experience'")
-    print("  - 'What are your technical skills?'")
-    print("  - 'Describe your career goals'")
-    print()
-    
-    while True:
-        question = input("You: ")
-        if question.lower() in ["exit", "quit"]:
-            print("👋 Thanks for chatting with your Digital Twin!")
-            break
+    async with create_http_client() as http_client:
+        groq_client = setup_groq_client(http_client)
+        if not groq_client:
+            return
+        
+        index = await setup_vector_database(reseed=args.reseed, http_client=http_client)
+        if not index:
+            return
+        
+        print("✅ Your Digital Twin is ready!\n")
         
-        if question.strip():
-            answer = rag_query(index, groq_client, question)
-            print(f"🤖 Digital Twin: {answer}\n")
+        # Interactive chat loop
+        print("🤖 Chat with your AI Digital Twin!")
+        print("Ask questions about your experience, skills, projects, or career goals.")
+        print("Type 'exit' to quit.\n")
+        
+        print("💭 Try asking:")
+        print("  - 'Tell me about your work experience'")
+        print("  - 'What are your technical skills?'")
+        print("  - 'Describe your career goals'")
+        print()
+        
+        session = PromptSession(history=FileHistory(HISTORY_FILE))
+        while True:
+            question = await session.prompt_async("You: ")
+            if question.lower() in ["exit", "quit"]:
+                print("👋 Thanks for chatting with your Digital Twin!")
+                break
+            
+            if question.strip():
+                answer = await rag_query(index, groq_client, question)
+                print("🤖 Digital Twin: ", end="", flush=True)
+                async for text in answer:
+                    print(text, end="", flush=True)
+                print("\n")
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
@@ -8,7 +8,8 @@ interface VectorMetadata {
   type: string;
   content: string;
   category: string;
-  tags: string[];
+  // Decimal string of a 60-bit tag bitmask; parse with BigInt, not Number
+  tagmask: string;
 }
 
 interface QueryResult {